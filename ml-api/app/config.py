@@ -1,11 +1,22 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 from typing import Optional
 
 class Settings(BaseSettings):
     MONGODB_URI: str = "mongodb://localhost:27017/savemymoney"
     API_PORT: int = 8000
+    DEBUG: bool = False
     NODE_API_URL: str = "http://localhost:5000"
     SECRET_KEY: str = "your-secret-key-change-this"
+    CLIENT_URL: Optional[str] = None
+
+    # MongoDB connection pool
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MAX_IDLE_TIME_MS: int = 10000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 10000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
 
     # Pydantic v2 settings config
     model_config = SettingsConfigDict(
@@ -14,4 +25,7 @@ class Settings(BaseSettings):
         case_sensitive=True,
     )
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get settings, reading the environment and .env only once per process"""
+    return Settings()
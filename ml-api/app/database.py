@@ -1,32 +1,63 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from app.config import settings
+from pymongo import AsyncMongoClient
+from app.config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Database:
-    client: AsyncIOMotorClient = None
+    client: AsyncMongoClient = None
 
 db = Database()
 
 async def connect_to_mongo():
     """Connect to MongoDB"""
+    settings = get_settings()
     try:
-        print(f"[DB] Connecting to MongoDB...")
-        print(f"[DB] URI: {settings.MONGODB_URI[:20]}...{settings.MONGODB_URI[-20:]}")
-        db.client = AsyncIOMotorClient(settings.MONGODB_URI)
+        logger.info("[DB] Connecting to MongoDB...")
+        logger.info("[DB] URI: %s...%s", settings.MONGODB_URI[:20], settings.MONGODB_URI[-20:])
+        db.client = AsyncMongoClient(
+            settings.MONGODB_URI,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+            connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            retryWrites=True,
+        )
         # Test connection
         await db.client.admin.command('ping')
-        print("[DB] ✅ Connected to MongoDB successfully!")
+        logger.info("[DB] ✅ Connected to MongoDB successfully!")
     except Exception as e:
-        print(f"[DB ERROR] ❌ Failed to connect to MongoDB: {type(e).__name__}: {str(e)}")
+        logger.error("[DB ERROR] ❌ Failed to connect to MongoDB: %s: %s", type(e).__name__, e)
         raise
 
+async def ensure_indexes():
+    """Create the indexes used by the prediction queries"""
+    try:
+        transactions = db.client.savemymoney.transactions
+        # Covers the per-category query and its date sort
+        await transactions.create_index(
+            [("user", 1), ("type", 1), ("category", 1), ("date", 1)],
+            background=True
+        )
+        # Covers the all-categories query and its date sort
+        await transactions.create_index(
+            [("user", 1), ("type", 1), ("date", 1)],
+            background=True
+        )
+        logger.info("[DB] ✅ Transaction indexes ensured")
+    except Exception as e:
+        logger.exception("[DB ERROR] ❌ Failed to create indexes: %s: %s", type(e).__name__, e)
+
 async def close_mongo_connection():
     """Close MongoDB connection"""
-    db.client.close()
-    print("Closed MongoDB connection")
+    await db.client.close()
+    logger.info("Closed MongoDB connection")
 
 def get_database():
     """Get database instance"""
     if db.client is None:
-        print("[DB ERROR] Database client is None! Connection not established.")
+        logger.error("[DB ERROR] Database client is None! Connection not established.")
         return None
     return db.client.savemymoney
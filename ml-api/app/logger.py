@@ -0,0 +1,29 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Records are queued by the caller and written to stdout by a background thread,
+# so log I/O never blocks the event loop
+log_queue = queue.SimpleQueue()
+
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+listener = QueueListener(log_queue, _stream_handler, respect_handler_level=True)
+
+def setup_logging(level: int = logging.INFO):
+    """Route root logger records through the queue"""
+    root = logging.getLogger()
+    if not any(isinstance(h, QueueHandler) for h in root.handlers):
+        root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+def start_logging():
+    """Start the background thread that writes queued records"""
+    listener.start()
+
+def stop_logging():
+    """Flush pending records and stop the background thread"""
+    listener.stop()
@@ -1,32 +1,59 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import os
+import sys
 import uvicorn
-from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.config import get_settings
+from app.logger import setup_logging, start_logging, stop_logging
+from app.database import connect_to_mongo, ensure_indexes, close_mongo_connection
 from app.routers import predictions
 
+setup_logging()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    await connect_to_mongo()
-    yield
-    # Shutdown
-    await close_mongo_connection()
+    start_logging()
+    try:
+        # Startup
+        await connect_to_mongo()
+        await ensure_indexes()
+        cache_watcher = asyncio.create_task(predictions.watch_transaction_changes())
+        yield
+        # Shutdown
+        cache_watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await cache_watcher
+        await close_mongo_connection()
+    finally:
+        # Flush queued records even if startup failed
+        stop_logging()
 
 app = FastAPI(
     title="SaveMyMoney ML API",
     description="API de Machine Learning para previsão de gastos",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# CORS Configuration - Allow all origins for simplicity
-# In production, replace ["*"] with specific URLs
+# CORS Configuration - same origins as the Node backend
+allowed_origins = [
+    origin for origin in (
+        "http://localhost:5173",
+        "http://localhost:3000",
+        get_settings().CLIENT_URL,
+    ) if origin
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins
-    allow_credentials=False,  # Must be False when allow_origins is ["*"]
+    allow_origins=allowed_origins,
+    # Allow all *.onrender.com domains (compiled once by Starlette)
+    allow_origin_regex=r"https://.*\.onrender\.com",
+    allow_credentials=False,  # No cookies are used by this API
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
 )
@@ -50,9 +77,15 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    settings = get_settings()
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=settings.API_PORT,
-        reload=True
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # Ignored by uvicorn when reload is enabled
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        reload=settings.DEBUG
     )
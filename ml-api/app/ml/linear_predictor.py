@@ -4,6 +4,7 @@ from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 from typing import List, Tuple, Dict
+from app.ml.preprocessing import transactions_to_arrays, daily_totals
 
 class LinearPredictor:
     """Linear Regression model for expense prediction"""
@@ -15,48 +16,53 @@ class LinearPredictor:
 
     def prepare_data(self, transactions: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare transaction data for training"""
-        if not transactions:
-            return np.array([]), np.array([])
+        return self.prepare_arrays(*transactions_to_arrays(transactions))
 
-        # Convert to DataFrame
-        df = pd.DataFrame(transactions)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
+    def prepare_arrays(
+        self,
+        dates: np.ndarray,
+        amounts: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Prepare date/amount arrays (see transactions_to_arrays) for training"""
+        if len(dates) == 0:
+            return np.array([]), np.array([])
 
         # Group by date and sum amounts
-        daily_expenses = df.groupby(df['date'].dt.date)['amount'].sum().reset_index()
-        daily_expenses.columns = ['date', 'amount']
-
-        # Convert date column back to datetime for calculations
-        daily_expenses['date'] = pd.to_datetime(daily_expenses['date'])
+        days, y = daily_totals(dates, amounts)
 
         # Create features: days since first transaction
-        first_date = daily_expenses['date'].min()
-        daily_expenses['days_since_start'] = (
-            daily_expenses['date'] - first_date
-        ).dt.days
-
-        X = daily_expenses[['days_since_start']].values
-        y = daily_expenses['amount'].values
+        X = (days - days[0]).astype(np.int64).reshape(-1, 1)
 
         return X, y
 
-    def train(self, transactions: List[Dict]) -> Dict[str, float]:
-        """Train the linear regression model"""
-        X, y = self.prepare_data(transactions)
-
+    def _fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray
+    ) -> Tuple[LinearRegression, StandardScaler]:
+        """Fit a fresh scaler and regression model on prepared data"""
         if len(X) < 2:
             raise ValueError("Need at least 2 data points to train the model")
 
         # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+
+        model = LinearRegression()
+        model.fit(X_scaled, y)
+
+        return model, scaler
+
+    def train(self, transactions: List[Dict]) -> Dict[str, float]:
+        """Train the linear regression model"""
+        X, y = self.prepare_data(transactions)
 
         # Train model
-        self.model.fit(X_scaled, y)
+        self.model, self.scaler = self._fit(X, y)
         self.is_trained = True
 
         # Calculate R² score
-        score = self.model.score(X_scaled, y)
+        score = self.model.score(self.scaler.transform(X), y)
 
         return {
             "r2_score": score,
@@ -70,10 +76,18 @@ class LinearPredictor:
         days_ahead: int = 30
     ) -> Dict:
         """Make predictions for future expenses"""
-        if not self.is_trained:
-            self.train(transactions)
+        dates, amounts = transactions_to_arrays(transactions)
+        return self.predict_arrays(dates, amounts, days_ahead)
 
-        X, y = self.prepare_data(transactions)
+    def predict_arrays(
+        self,
+        dates: np.ndarray,
+        amounts: np.ndarray,
+        days_ahead: int = 30
+    ) -> Dict:
+        """Make predictions from arrays already built by transactions_to_arrays"""
+        X, y = self.prepare_arrays(dates, amounts)
+        model, scaler = self._fit(X, y)
 
         if len(X) == 0:
             return self._empty_prediction(days_ahead)
@@ -87,20 +101,18 @@ class LinearPredictor:
         ])
 
         # Scale and predict
-        future_days_scaled = self.scaler.transform(future_days)
-        predictions = self.model.predict(future_days_scaled)
+        future_days_scaled = scaler.transform(future_days)
+        predictions = model.predict(future_days_scaled)
 
         # Ensure predictions are non-negative
         predictions = np.maximum(predictions, 0)
 
         # Calculate confidence intervals (simple approach using std)
-        residuals = y - self.model.predict(self.scaler.transform(X))
+        residuals = y - model.predict(scaler.transform(X))
         std_error = np.std(residuals)
 
         # Get first transaction date to calculate actual dates
-        df = pd.DataFrame(transactions)
-        df['date'] = pd.to_datetime(df['date'])
-        first_date = df['date'].min()
+        first_date = pd.Timestamp(dates[0])
 
         # Prepare response
         prediction_points = []
@@ -121,8 +133,8 @@ class LinearPredictor:
             "total_predicted": float(np.sum(predictions)),
             "avg_daily_spending": float(np.mean(predictions)),
             "trend": trend,
-            "accuracy_score": float(self.model.score(
-                self.scaler.transform(X), y
+            "accuracy_score": float(model.score(
+                scaler.transform(X), y
             )) if len(X) > 1 else 0.0
         }
 
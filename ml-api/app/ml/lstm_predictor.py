@@ -2,9 +2,13 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple
+import logging
+from app.ml.preprocessing import transactions_to_arrays, daily_totals
 import warnings
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
 try:
     from tensorflow import keras
     from tensorflow.keras.models import Sequential
@@ -13,7 +17,7 @@ try:
     TENSORFLOW_AVAILABLE = True
 except ImportError:
     TENSORFLOW_AVAILABLE = False
-    print("TensorFlow not available. LSTM predictions will fall back to linear regression.")
+    logger.warning("TensorFlow not available. LSTM predictions will fall back to linear regression.")
 
 class LSTMPredictor:
     """LSTM model for time series expense prediction"""
@@ -37,31 +41,27 @@ class LSTMPredictor:
 
     def prepare_data(self, transactions: List[Dict]) -> pd.DataFrame:
         """Prepare transaction data for LSTM"""
-        if not transactions:
-            return pd.DataFrame()
+        return self.prepare_arrays(*transactions_to_arrays(transactions))
 
-        df = pd.DataFrame(transactions)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
+    def prepare_arrays(self, dates: np.ndarray, amounts: np.ndarray) -> pd.DataFrame:
+        """Prepare date/amount arrays (see transactions_to_arrays) for LSTM"""
+        if len(dates) == 0:
+            return pd.DataFrame()
 
         # Group by date and sum amounts
-        daily_expenses = df.groupby(df['date'].dt.date)['amount'].sum().reset_index()
-        daily_expenses.columns = ['date', 'amount']
-        daily_expenses['date'] = pd.to_datetime(daily_expenses['date'])
+        days, totals = daily_totals(dates, amounts)
 
         # Fill missing dates with 0
-        date_range = pd.date_range(
-            start=daily_expenses['date'].min(),
-            end=daily_expenses['date'].max(),
-            freq='D'
-        )
-        daily_expenses = daily_expenses.set_index('date').reindex(date_range, fill_value=0)
-        daily_expenses = daily_expenses.reset_index()
-        daily_expenses.columns = ['date', 'amount']
+        offsets = (days - days[0]).astype(np.int64)
+        filled = np.zeros(offsets[-1] + 1)
+        filled[offsets] = totals
 
-        return daily_expenses
+        return pd.DataFrame({
+            'date': pd.date_range(start=days[0], periods=len(filled), freq='D'),
+            'amount': filled
+        })
 
-    def build_model(self, input_shape: Tuple) -> Sequential:
+    def build_model(self, input_shape: Tuple) -> "Sequential":
         """Build LSTM model architecture"""
         model = Sequential([
             LSTM(50, activation='relu', return_sequences=True, input_shape=input_shape),
@@ -74,19 +74,15 @@ class LSTMPredictor:
         model.compile(optimizer='adam', loss='mse', metrics=['mae'])
         return model
 
-    def train(self, transactions: List[Dict]) -> Dict[str, float]:
-        """Train the LSTM model"""
-        if not TENSORFLOW_AVAILABLE:
-            raise RuntimeError("TensorFlow is not available. Cannot train LSTM model.")
-
-        daily_expenses = self.prepare_data(transactions)
-
+    def _fit(self, daily_expenses: pd.DataFrame) -> Tuple["Sequential", "MinMaxScaler", Dict]:
+        """Fit a fresh scaler and LSTM model on prepared daily expenses"""
         if len(daily_expenses) < self.lookback + 1:
             raise ValueError(f"Need at least {self.lookback + 1} days of data to train LSTM model")
 
         # Scale data
+        scaler = MinMaxScaler()
         amounts = daily_expenses['amount'].values.reshape(-1, 1)
-        amounts_scaled = self.scaler.fit_transform(amounts)
+        amounts_scaled = scaler.fit_transform(amounts)
 
         # Prepare sequences
         X, y = self.prepare_sequences(amounts_scaled)
@@ -98,10 +94,10 @@ class LSTMPredictor:
         X = X.reshape((X.shape[0], X.shape[1], 1))
 
         # Build and train model
-        self.model = self.build_model((X.shape[1], 1))
+        model = self.build_model((X.shape[1], 1))
 
         # Train with early stopping to prevent overfitting
-        history = self.model.fit(
+        history = model.fit(
             X, y,
             epochs=50,
             batch_size=8,
@@ -110,16 +106,26 @@ class LSTMPredictor:
             shuffle=False
         )
 
+        return model, scaler, history.history
+
+    def train(self, transactions: List[Dict]) -> Dict[str, float]:
+        """Train the LSTM model"""
+        if not TENSORFLOW_AVAILABLE:
+            raise RuntimeError("TensorFlow is not available. Cannot train LSTM model.")
+
+        daily_expenses = self.prepare_data(transactions)
+        self.model, self.scaler, history = self._fit(daily_expenses)
+
         self.is_trained = True
 
         # Calculate final loss
-        final_loss = history.history['loss'][-1]
-        final_mae = history.history['mae'][-1]
+        final_loss = history['loss'][-1]
+        final_mae = history['mae'][-1]
 
         return {
             "loss": float(final_loss),
             "mae": float(final_mae),
-            "epochs_trained": len(history.history['loss'])
+            "epochs_trained": len(history['loss'])
         }
 
     def predict(
@@ -128,20 +134,28 @@ class LSTMPredictor:
         days_ahead: int = 30
     ) -> Dict:
         """Make predictions for future expenses"""
+        dates, amounts = transactions_to_arrays(transactions)
+        return self.predict_arrays(dates, amounts, days_ahead)
+
+    def predict_arrays(
+        self,
+        dates: np.ndarray,
+        amounts: np.ndarray,
+        days_ahead: int = 30
+    ) -> Dict:
+        """Make predictions from arrays already built by transactions_to_arrays"""
         if not TENSORFLOW_AVAILABLE:
             raise RuntimeError("TensorFlow is not available. Cannot make LSTM predictions.")
 
-        if not self.is_trained:
-            self.train(transactions)
-
-        daily_expenses = self.prepare_data(transactions)
+        daily_expenses = self.prepare_arrays(dates, amounts)
+        model, scaler, _ = self._fit(daily_expenses)
 
         if len(daily_expenses) < self.lookback:
             return self._empty_prediction(days_ahead)
 
         # Get last lookback days
         amounts = daily_expenses['amount'].values.reshape(-1, 1)
-        amounts_scaled = self.scaler.transform(amounts)
+        amounts_scaled = scaler.transform(amounts)
         last_sequence = amounts_scaled[-self.lookback:]
 
         # Make predictions
@@ -153,7 +167,7 @@ class LSTMPredictor:
             current_input = current_sequence.reshape((1, self.lookback, 1))
 
             # Predict next value
-            next_pred = self.model.predict(current_input, verbose=0)[0][0]
+            next_pred = model.predict(current_input, verbose=0)[0][0]
             predictions.append(next_pred)
 
             # Update sequence (shift and add new prediction)
@@ -161,7 +175,7 @@ class LSTMPredictor:
 
         # Inverse transform predictions
         predictions = np.array(predictions).reshape(-1, 1)
-        predictions = self.scaler.inverse_transform(predictions)
+        predictions = scaler.inverse_transform(predictions)
         predictions = np.maximum(predictions.flatten(), 0)  # Ensure non-negative
 
         # Calculate confidence intervals using historical variance
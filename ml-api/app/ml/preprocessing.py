@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Tuple
+
+def transactions_to_arrays(transactions: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert transactions to date-sorted (datetime64[D], float64) arrays.
+
+    Lets several predictors share a single date parse over the same data.
+    """
+    if not transactions:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64)
+
+    dates = pd.to_datetime([t['date'] for t in transactions]).values.astype("datetime64[D]")
+    amounts = np.fromiter(
+        (t['amount'] for t in transactions),
+        dtype=np.float64,
+        count=len(transactions)
+    )
+
+    order = np.argsort(dates, kind="stable")
+    return dates[order], amounts[order]
+
+def daily_totals(dates: np.ndarray, amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum amounts per day, returning the distinct days and their totals"""
+    days, day_index = np.unique(dates, return_inverse=True)
+    totals = np.bincount(day_index, weights=amounts, minlength=len(days))
+    return days, totals
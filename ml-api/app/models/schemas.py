@@ -1,10 +1,17 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional
 from datetime import datetime
 
+ModelType = Literal["linear", "lstm"]
+
 class BaseSchema(BaseModel):
-    # Allow fields starting with 'model_' (e.g., model_type) without warnings
-    model_config = ConfigDict(protected_namespaces=())
+    model_config = ConfigDict(
+        # Allow fields starting with 'model_' (e.g., model_type) without warnings
+        protected_namespaces=(),
+        # Schemas are built once per request and never mutated
+        frozen=True,
+        extra="ignore",
+    )
 
 
 class Transaction(BaseSchema):
@@ -17,8 +24,8 @@ class Transaction(BaseSchema):
 class PredictionRequest(BaseSchema):
     user_id: str
     category: Optional[str] = None
-    days_ahead: int = Field(default=30, ge=1, le=365)
-    model_type: str = Field(default="linear", pattern="^(linear|lstm)$")
+    days_ahead: Annotated[int, Field(ge=1, le=365)] = 30
+    model_type: ModelType = "linear"
 
 class PredictionPoint(BaseSchema):
     date: str
@@ -35,7 +42,7 @@ class PredictionResponse(BaseSchema):
     total_predicted: float
     avg_daily_spending: float
     trend: str  # "increasing", "decreasing", "stable"
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class CategoryInsights(BaseSchema):
     category: str
@@ -49,4 +56,4 @@ class InsightsResponse(BaseSchema):
     total_predicted_spending: float
     categories: List[CategoryInsights]
     overall_trend: str
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,71 +1,226 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from app.models.schemas import (
     PredictionRequest,
     PredictionResponse,
     InsightsResponse,
-    CategoryInsights
+    CategoryInsights,
+    ModelType
 )
 from app.database import get_database
 from app.ml.linear_predictor import LinearPredictor
-from app.ml.lstm_predictor import LSTMPredictor, TENSORFLOW_AVAILABLE
+from app.ml.preprocessing import transactions_to_arrays
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Tuple
 from bson import ObjectId
+from pymongo.errors import PyMongoError
+from async_lru import alru_cache
+import asyncio
+import logging
 
 router = APIRouter()
-
-async def get_user_transactions(user_id: str, category: str = None) -> List[Dict]:
-    """Fetch user transactions from MongoDB"""
+logger = logging.getLogger(__name__)
+
+# Documents fetched per round-trip when streaming transactions
+TRANSACTIONS_BATCH_SIZE = 200
+
+# Transaction lookups are cached briefly so dashboard refreshes don't re-query Mongo;
+# watch_transaction_changes clears them on writes where change streams are available
+TRANSACTIONS_CACHE_SIZE = 1024
+TRANSACTIONS_CACHE_TTL = 60  # seconds
+
+# predict() fits a fresh model on each call's data without touching instance state,
+# so one predictor can be shared across requests and threads
+_LINEAR_PREDICTOR = LinearPredictor()
+
+# The LSTM module imports TensorFlow, so it is only loaded on first LSTM use
+_lstm_predictor = None
+_lstm_loaded = False
+
+def _load_lstm_predictor():
+    """Import the LSTM module and build the shared predictor (None without TensorFlow)"""
+    global _lstm_predictor, _lstm_loaded
+    from app.ml.lstm_predictor import LSTMPredictor, TENSORFLOW_AVAILABLE
+
+    _lstm_predictor = LSTMPredictor(lookback=7) if TENSORFLOW_AVAILABLE else None
+    _lstm_loaded = True
+    return _lstm_predictor
+
+async def _get_lstm_predictor():
+    """Get the shared LSTM predictor; the first call imports TensorFlow off the event loop"""
+    if _lstm_loaded:
+        return _lstm_predictor
+    return await asyncio.to_thread(_load_lstm_predictor)
+
+def _build_expense_query(user_id: str, category: str = None) -> Dict:
+    """Build the MongoDB filter for a user's expenses"""
+    # Convert user_id string to ObjectId for MongoDB query
     try:
-        print(f"[DB] Fetching transactions for user_id={user_id}, category={category}")
-        db = get_database()
+        user_object_id = ObjectId(user_id)
+        query = {"user": user_object_id, "type": "expense"}
+    except Exception as e:
+        logger.warning("[DB ERROR] Invalid ObjectId format for user_id=%s: %s", user_id, e)
+        # Fallback: try as string in case some records use string
+        query = {"user": user_id, "type": "expense"}
 
-        if db is None:
-            print("[DB ERROR] Database connection is None!")
-            return []
+    if category:
+        query["category"] = category
 
-        transactions_collection = db.transactions
+    return query
 
-        # Convert user_id string to ObjectId for MongoDB query
-        try:
-            user_object_id = ObjectId(user_id)
-            query = {"user": user_object_id, "type": "expense"}
-        except Exception as e:
-            print(f"[DB ERROR] Invalid ObjectId format for user_id={user_id}: {e}")
-            # Fallback: try as string in case some records use string
-            query = {"user": user_id, "type": "expense"}
+async def get_user_transactions(user_id: str, category: str = None) -> Tuple[Dict, ...]:
+    """
+    Fetch user transactions from MongoDB.
 
-        if category:
-            query["category"] = category
+    Results are cached per (user_id, category) for TRANSACTIONS_CACHE_TTL
+    seconds and returned as a tuple; callers must not mutate the rows.
+    """
+    try:
+        logger.info("[DB] Fetching transactions for user_id=%s, category=%s", user_id, category)
 
-        print(f"[DB] Query: {query}")
-        cursor = transactions_collection.find(query).sort("date", 1)
-        transactions = await cursor.to_list(length=1000)
-        print(f"[DB] Retrieved {len(transactions)} transactions")
+        if get_database() is None:
+            logger.error("[DB ERROR] Database connection is None!")
+            return ()
 
-        # Convert MongoDB ObjectId to string
-        for trans in transactions:
-            trans['_id'] = str(trans['_id'])
-            trans['user'] = str(trans['user'])
+        transactions = await _fetch_user_transactions(user_id, category)
+        logger.info("[DB] Retrieved %d transactions", len(transactions))
 
         return transactions
     except Exception as e:
-        print(f"[DB ERROR] Error fetching transactions: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return []
+        logger.exception("[DB ERROR] Error fetching transactions: %s: %s", type(e).__name__, e)
+        return ()
+
+@alru_cache(maxsize=TRANSACTIONS_CACHE_SIZE, ttl=TRANSACTIONS_CACHE_TTL)
+async def _fetch_user_transactions(user_id: str, category: str) -> Tuple[Dict, ...]:
+    """Query MongoDB for a user's expenses; errors propagate and are not cached"""
+    transactions_collection = get_database().transactions
+    query = _build_expense_query(user_id, category)
+
+    logger.debug("[DB] Query: %s", query)
+    # Predictors only need these fields; skipping _id/user avoids ObjectId conversion
+    projection = {"_id": 0, "date": 1, "amount": 1, "category": 1}
+    cursor = (
+        transactions_collection.find(query, projection)
+        .sort("date", 1)
+        .batch_size(TRANSACTIONS_BATCH_SIZE)
+    )
+
+    # Stream batches so decoding overlaps network round-trips
+    transactions = []
+    async for trans in cursor:
+        transactions.append(trans)
+
+    return tuple(transactions)
+
+async def get_user_category_series(user_id: str) -> Dict[str, Dict]:
+    """
+    Fetch daily expense totals per category, aggregated in MongoDB.
+
+    Returns a mapping of category -> {"transactions", "count", "current_avg"},
+    where "transactions" holds one {"date", "amount"} entry per day, sorted by date.
+    Results are cached like get_user_transactions; callers must not mutate them.
+    """
+    try:
+        if get_database() is None:
+            logger.error("[DB ERROR] Database connection is None!")
+            return {}
+
+        grouped = await _fetch_user_category_series(user_id)
+        logger.info("[DB] Aggregated %d categories for user_id=%s", len(grouped), user_id)
+
+        return grouped
+    except Exception as e:
+        logger.exception("[DB ERROR] Error aggregating transactions: %s: %s", type(e).__name__, e)
+        return {}
+
+@alru_cache(maxsize=TRANSACTIONS_CACHE_SIZE, ttl=TRANSACTIONS_CACHE_TTL)
+async def _fetch_user_category_series(user_id: str) -> Dict[str, Dict]:
+    """Run the per-category aggregation; errors propagate and are not cached"""
+    pipeline = [
+        {"$match": _build_expense_query(user_id)},
+        {"$group": {
+            "_id": {
+                "cat": "$category",
+                "day": {"$dateTrunc": {"date": "$date", "unit": "day"}}
+            },
+            "amount": {"$sum": "$amount"},
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"_id.day": 1}},
+        {"$group": {
+            "_id": "$_id.cat",
+            "days": {"$push": {"date": "$_id.day", "amount": "$amount"}},
+            "total": {"$sum": "$amount"},
+            "count": {"$sum": "$count"}
+        }},
+        {"$project": {
+            "days": 1,
+            "count": 1,
+            "current_avg": {"$divide": ["$total", "$count"]}
+        }}
+    ]
+
+    cursor = await get_database().transactions.aggregate(pipeline)
+    grouped = {}
+    async for doc in cursor:
+        grouped[doc["_id"]] = {
+            "transactions": tuple(doc["days"]),
+            "count": doc["count"],
+            "current_avg": doc["current_avg"]
+        }
+
+    return grouped
+
+def clear_transactions_cache():
+    """Drop this process's cached transaction lookups"""
+    _fetch_user_transactions.cache_clear()
+    _fetch_user_category_series.cache_clear()
+
+async def watch_transaction_changes():
+    """
+    Clear the transaction caches whenever the transactions collection changes.
+
+    Caches are per process, so every worker runs its own watcher; writes made by the
+    Node backend then reach all of them. Change streams need a replica set (e.g. Atlas);
+    on a standalone server cached entries only expire after TRANSACTIONS_CACHE_TTL.
+    """
+    db = get_database()
+    if db is None:
+        return
+
+    try:
+        async with await db.transactions.watch() as stream:
+            logger.info("[DB] Watching transactions for cache invalidation")
+            # Any write clears every user's entries; writes are rare next to reads
+            async for _ in stream:
+                clear_transactions_cache()
+    except PyMongoError as e:
+        logger.warning(
+            "[DB] Transaction change stream unavailable (%s: %s); cached entries expire after %ds",
+            type(e).__name__, e, TRANSACTIONS_CACHE_TTL
+        )
 
-@router.post("/predict", response_model=PredictionResponse)
+# Responses are built from validated models and returned as ORJSONResponse directly,
+# so response_model is only used for the OpenAPI docs and not re-validated
+@router.post(
+    "/predict",
+    response_model=None,
+    responses={200: {"model": PredictionResponse}}
+)
 async def predict_expenses(request: PredictionRequest):
     """
     Predict future expenses using Linear Regression or LSTM
     """
+    now = datetime.utcnow()
     try:
-        print(f"[PREDICT] Request: user_id={request.user_id}, category={request.category}, days_ahead={request.days_ahead}, model={request.model_type}")
+        logger.info(
+            "[PREDICT] Request: user_id=%s, category=%s, days_ahead=%s, model=%s",
+            request.user_id, request.category, request.days_ahead, request.model_type
+        )
 
         # Fetch user transactions
         transactions = await get_user_transactions(request.user_id, request.category)
-        print(f"[PREDICT] Found {len(transactions)} transactions")
+        logger.info("[PREDICT] Found %d transactions", len(transactions))
 
         if not transactions:
             raise HTTPException(
@@ -75,20 +230,23 @@ async def predict_expenses(request: PredictionRequest):
 
         # Select model based on request
         if request.model_type == "lstm":
-            if not TENSORFLOW_AVAILABLE:
+            predictor = await _get_lstm_predictor()
+            if predictor is None:
                 raise HTTPException(
                     status_code=503,
                     detail="LSTM model not available. TensorFlow is not installed. Using linear regression instead."
                 )
-            predictor = LSTMPredictor(lookback=7)
         else:
-            predictor = LinearPredictor()
+            predictor = _LINEAR_PREDICTOR
 
-        print(f"[PREDICT] Using predictor: {predictor.__class__.__name__}")
+        logger.info("[PREDICT] Using predictor: %s", predictor.__class__.__name__)
 
         # Make predictions
         result = predictor.predict(transactions, request.days_ahead)
-        print(f"[PREDICT] Prediction successful: total={result['total_predicted']}, trend={result['trend']}")
+        logger.info(
+            "[PREDICT] Prediction successful: total=%s, trend=%s",
+            result["total_predicted"], result["trend"]
+        )
 
         # Prepare response
         response = PredictionResponse(
@@ -99,83 +257,84 @@ async def predict_expenses(request: PredictionRequest):
             accuracy_score=result.get("accuracy_score"),
             total_predicted=result["total_predicted"],
             avg_daily_spending=result["avg_daily_spending"],
-            trend=result["trend"]
+            trend=result["trend"],
+            created_at=now
         )
 
-        return response
+        return ORJSONResponse(content=response.model_dump())
 
     except HTTPException:
         raise
     except ValueError as e:
-        print(f"[PREDICT ERROR] ValueError: {str(e)}")
+        logger.warning("[PREDICT ERROR] ValueError: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[PREDICT ERROR] Exception: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[PREDICT ERROR] Exception: %s", type(e).__name__)
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-@router.get("/insights/{user_id}", response_model=InsightsResponse)
+@router.get(
+    "/insights/{user_id}",
+    response_model=None,
+    responses={200: {"model": InsightsResponse}}
+)
 async def get_spending_insights(user_id: str, days_ahead: int = 30):
     """
     Get spending insights across all categories
     """
+    now = datetime.utcnow()
     try:
-        # Fetch all transactions
-        transactions = await get_user_transactions(user_id)
+        # Fetch daily totals grouped by category
+        grouped = await get_user_category_series(user_id)
 
-        if not transactions:
+        if not grouped:
             raise HTTPException(
                 status_code=404,
                 detail="No transaction data found for this user"
             )
 
-        # Get unique categories
-        categories = list(set([t['category'] for t in transactions]))
-
         category_insights = []
         total_predicted = 0.0
-
-        predictor = LinearPredictor()
-
-        for category in categories:
-            # Filter transactions by category
-            cat_transactions = [t for t in transactions if t['category'] == category]
-
-            if len(cat_transactions) < 2:
+        trend_counts = {"increasing": 0, "decreasing": 0, "stable": 0}
+
+        eligible = [
+            (category, series)
+            for category, series in grouped.items()
+            if series["count"] >= 2
+        ]
+
+        # Run the CPU-bound predictions off the event loop, one thread per category
+        tasks = [
+            asyncio.to_thread(_LINEAR_PREDICTOR.predict, series["transactions"], days_ahead)
+            for _, series in eligible
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for (category, series), result in zip(eligible, results):
+            if isinstance(result, Exception):
+                logger.error("Error predicting for category %s: %s", category, result)
                 continue
 
-            # Make predictions
-            try:
-                result = predictor.predict(cat_transactions, days_ahead)
-
-                # Calculate current average
-                import pandas as pd
-                df = pd.DataFrame(cat_transactions)
-                current_avg = df['amount'].mean()
-
-                # Create insight
-                insight = CategoryInsights(
-                    category=category,
-                    current_avg=float(current_avg),
-                    predicted_avg=result["avg_daily_spending"],
-                    trend=result["trend"],
-                    recommendation=_generate_recommendation(
-                        result["trend"],
-                        result["avg_daily_spending"],
-                        float(current_avg)
-                    )
+            current_avg = series["current_avg"]
+
+            # Create insight
+            insight = CategoryInsights(
+                category=category,
+                current_avg=float(current_avg),
+                predicted_avg=result["avg_daily_spending"],
+                trend=result["trend"],
+                recommendation=_generate_recommendation(
+                    result["trend"],
+                    result["avg_daily_spending"],
+                    float(current_avg)
                 )
-                category_insights.append(insight)
-                total_predicted += result["total_predicted"]
-
-            except Exception as e:
-                print(f"Error predicting for category {category}: {e}")
-                continue
+            )
+            category_insights.append(insight)
+            total_predicted += result["total_predicted"]
+            trend_counts[result["trend"]] += 1
 
         # Determine overall trend
-        increasing_count = sum(1 for ci in category_insights if ci.trend == "increasing")
-        decreasing_count = sum(1 for ci in category_insights if ci.trend == "decreasing")
+        increasing_count = trend_counts["increasing"]
+        decreasing_count = trend_counts["decreasing"]
 
         if increasing_count > decreasing_count:
             overall_trend = "increasing"
@@ -188,14 +347,16 @@ async def get_spending_insights(user_id: str, days_ahead: int = 30):
             user_id=user_id,
             total_predicted_spending=total_predicted,
             categories=category_insights,
-            overall_trend=overall_trend
+            overall_trend=overall_trend,
+            created_at=now
         )
 
-        return response
+        return ORJSONResponse(content=response.model_dump())
 
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("[INSIGHTS ERROR] Exception: %s", type(e).__name__)
         raise HTTPException(status_code=500, detail=f"Insights error: {str(e)}")
 
 @router.get("/category/{user_id}/{category}")
@@ -203,7 +364,7 @@ async def predict_category(
     user_id: str,
     category: str,
     days_ahead: int = 30,
-    model_type: str = "linear"
+    model_type: ModelType = "linear"
 ):
     """
     Predict expenses for a specific category
@@ -230,9 +391,28 @@ async def compare_models(user_id: str, days_ahead: int = 30):
                 detail="No transaction data found for this user"
             )
 
+        # Parse dates and amounts once (off the event loop; the history is uncapped)
+        # and feed the same arrays to both models
+        dates, amounts = await asyncio.to_thread(transactions_to_arrays, transactions)
+        lstm_predictor = await _get_lstm_predictor() if len(transactions) >= 8 else None
+
+        # Run both models in parallel threads so latency is the slower one, not the sum
+        linear_task = asyncio.to_thread(
+            _LINEAR_PREDICTOR.predict_arrays, dates, amounts, days_ahead
+        )
+        if lstm_predictor is not None:
+            lstm_task = asyncio.to_thread(
+                lstm_predictor.predict_arrays, dates, amounts, days_ahead
+            )
+            linear_result, lstm_result = await asyncio.gather(
+                linear_task, lstm_task, return_exceptions=True
+            )
+        else:
+            linear_result, lstm_result = await linear_task, None
+
         # Linear prediction
-        linear_predictor = LinearPredictor()
-        linear_result = linear_predictor.predict(transactions, days_ahead)
+        if isinstance(linear_result, Exception):
+            raise linear_result
 
         result = {
             "user_id": user_id,
@@ -246,26 +426,27 @@ async def compare_models(user_id: str, days_ahead: int = 30):
         }
 
         # LSTM prediction (if available)
-        if TENSORFLOW_AVAILABLE and len(transactions) >= 8:
-            try:
-                lstm_predictor = LSTMPredictor()
-                lstm_result = lstm_predictor.predict(transactions, days_ahead)
-                result["lstm"] = {
-                    "total_predicted": lstm_result["total_predicted"],
-                    "avg_daily_spending": lstm_result["avg_daily_spending"],
-                    "trend": lstm_result["trend"],
-                    "accuracy_score": lstm_result.get("accuracy_score", 0.0)
-                }
-            except Exception as e:
-                result["lstm_error"] = str(e)
-        else:
+        if lstm_predictor is None:
             result["lstm"] = "Not available (requires TensorFlow and at least 8 days of data)"
+        elif isinstance(lstm_result, Exception):
+            result["lstm_error"] = str(lstm_result)
+        else:
+            result["lstm"] = {
+                "total_predicted": lstm_result["total_predicted"],
+                "avg_daily_spending": lstm_result["avg_daily_spending"],
+                "trend": lstm_result["trend"],
+                "accuracy_score": lstm_result.get("accuracy_score", 0.0)
+            }
 
         return result
 
     except HTTPException:
         raise
+    except ValueError as e:
+        logger.warning("[COMPARE ERROR] ValueError: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        logger.exception("[COMPARE ERROR] Exception: %s", type(e).__name__)
         raise HTTPException(status_code=500, detail=f"Comparison error: {str(e)}")
 
 def _generate_recommendation(trend: str, predicted_avg: float, current_avg: float) -> str: